@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+CLI Cold-Start Benchmark (Data Quality Hell project)
+
+Measures how long `python src/dqh.py <command> --help` takes from a cold
+interpreter, and times real runs of the light stages (merge, cube, flatten)
+against an empty temporary data/ tree. Checks with `-X importtime` that light
+commands never import pandas, numpy or requests. Every run must exit with code 0;
+a failing command is reported instead of timed.
+
+The drop is measured against the eager path flatten_raw.py used to take
+(`import pandas` at module load, then `--help`); that baseline needs pandas.
+
+    python benchmarks/bench_cli_startup.py --runs 20
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DQH = Path(__file__).resolve().parent.parent / "src" / "dqh.py"
+FLATTEN = DQH.parent / "processing" / "flatten_raw.py"
+HEAVY_MODULES = ("pandas", "numpy", "requests")
+LIGHT_COMMANDS = ["bulk", "tech", "flatten", "merge", "cube"]
+HEAVY_COMMANDS = ["countries", "fetch", "eda"]
+# Light stages run for real (argument parsing, stage import, directory scans) on an empty data/ tree
+REAL_RUNS = ["merge", "cube", "flatten"]
+# flatten --help as it ran before pandas became a lazy import
+EAGER_FLATTEN = (
+    "import pandas, runpy, sys; "
+    f"sys.argv = [{str(FLATTEN)!r}, '--help']; "
+    f"runpy.run_path({str(FLATTEN)!r}, run_name='__main__')"
+)
+
+
+def check_exit(result, cmd):
+    """Raises RuntimeError with the last stderr line if cmd did not exit with code 0."""
+    if result.returncode != 0:
+        last_line = (result.stderr.strip().splitlines() or ["no output"])[-1]
+        raise RuntimeError(f"exit code {result.returncode}: {last_line}")
+
+
+def time_command(cmd, runs: int, cwd=None) -> float:
+    """Median wall time (ms) of a fresh interpreter running cmd."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, cwd=cwd)
+        samples.append((time.perf_counter() - start) * 1000)
+        check_exit(result, cmd)
+    return statistics.median(samples)
+
+
+def imported_heavy_modules(cmd, cwd=None) -> list:
+    """Top-level heavy packages reported by -X importtime for cmd."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + cmd[1:],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=cwd,
+    )
+    check_exit(result, cmd)
+    found = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        module = line.rsplit("|", 1)[-1].strip()
+        if module.split(".")[0] in HEAVY_MODULES:
+            found.add(module.split(".")[0])
+    return sorted(found)
+
+
+def measure(label: str, cmd, runs: int, floor: float, cwd=None):
+    """Prints one table row; returns (median ms, heavy imports), or None if cmd failed."""
+    try:
+        elapsed = time_command(cmd, runs, cwd=cwd)
+        heavy = imported_heavy_modules(cmd, cwd=cwd)
+    except RuntimeError as e:
+        print(f"{label:<32}{'failed':>10}  {e}")
+        return None
+    print(f"{label:<32}{elapsed:>10.1f}{elapsed - floor:>12.1f}  {', '.join(heavy) or '-'}")
+    return elapsed, heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dqh cold-start time")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command. Default: 10")
+    args = parser.parse_args(argv)
+
+    floor = time_command([sys.executable, "-c", "pass"], args.runs)
+    print(f"Interpreter floor (python -c pass): {floor:7.1f} ms\n")
+    print(f"{'command':<32}{'median ms':>10}{'over floor':>12}  heavy imports")
+
+    failed = []
+    heavy_light = []
+    timings = {}
+    for command in LIGHT_COMMANDS + HEAVY_COMMANDS:
+        result = measure(f"{command} --help", [sys.executable, str(DQH), command, "--help"], args.runs, floor)
+        if result is None:
+            failed.append(f"{command} --help")
+            continue
+        timings[command], heavy = result
+        if command in LIGHT_COMMANDS and heavy:
+            heavy_light.append(f"{command} --help")
+
+    print()
+    with tempfile.TemporaryDirectory(prefix="bench_cli_") as tmp:
+        for sub_dir in ("raw", "interim"):
+            (Path(tmp) / "data" / sub_dir).mkdir(parents=True)
+        for command in REAL_RUNS:
+            result = measure(f"{command} (real run)", [sys.executable, str(DQH), command], args.runs, floor, cwd=tmp)
+            if result is None:
+                failed.append(f"{command} (real run)")
+            elif result[1]:
+                heavy_light.append(f"{command} (real run)")
+
+    print()
+    try:
+        eager = time_command([sys.executable, "-c", EAGER_FLATTEN], args.runs)
+    except RuntimeError as e:
+        print(f"{'flatten --help, eager pandas':<32}{'n/a':>10}  baseline needs pandas ({e})")
+    else:
+        print(f"{'flatten --help, eager pandas':<32}{eager:>10.1f}{eager - floor:>12.1f}  (before: pandas imported at load)")
+        if "flatten" in timings:
+            drop = eager - timings["flatten"]
+            print(f"\nCold-start drop for flatten --help: {drop:.1f} ms ({drop / eager:.0%} of the eager path)")
+
+    if failed:
+        print(f"\n❌ {len(failed)} run(s) failed and are not timed: {', '.join(failed)}")
+    if heavy_light:
+        print(f"\n❌ {len(heavy_light)} light command run(s) imported heavy modules: {', '.join(heavy_light)}")
+    if failed or heavy_light:
+        return 1
+
+    print("\n✅ Light commands start without pandas/numpy/requests.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Merge Benchmark (Data Quality Hell project)
+
+Generates synthetic interim CSVs (same schema as flatten_raw.py, with ids repeated
+across role searches) and compares the previous DictReader/DictWriter merge, the
+list-based merge_csv_files and the external-sort merge_csv_files_sorted, both for
+the merge alone and for merge + id-level grouping (in-memory dict for the unsorted
+output, linear scan for the sorted one).
+Also checks that all outputs hold the same rows and that the sorted output is
+clustered by id.
+
+    python benchmarks/bench_merge.py --rows-per-file 20000 --files 20 --workers 8
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "processing"))
+
+from merge_data import iter_id_groups, merge_csv_files, merge_csv_files_sorted  # noqa: E402
+
+FIELDNAMES = ["description", "title", "id", "company", "adref", "location", "created", "search_term"]
+ROLES = ["Data Engineer", "Data Scientist", "Data Analyst", "Mlops", "Data Architect"]
+COUNTRIES = ["gb", "us", "de", "fr", "es", "it", "nl", "pl", "at", "ch"]
+
+
+def generate_interim(interim_dir: Path, files: int, rows_per_file: int, seed: int = 42):
+    """Writes `files` role/country CSVs; ids overlap across roles of the same country."""
+    rng = random.Random(seed)
+    id_space = rows_per_file * 2
+    for idx in range(files):
+        country = COUNTRIES[idx % len(COUNTRIES)]
+        role = ROLES[(idx // len(COUNTRIES)) % len(ROLES)]
+        slug = f"{role.lower().replace(' ', '_')}_{idx}"
+        path = interim_dir / f"{country}_{slug}_jobs.csv"
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            writer.writerow(FIELDNAMES)
+            for _ in range(rows_per_file):
+                job_id = str(4_000_000_000 + (COUNTRIES.index(country) * id_space) + rng.randrange(id_space))
+                writer.writerow([
+                    "Lorem ipsum, \"data\" platform role. " * rng.randint(3, 12),
+                    f"{role} {rng.randint(1, 999)}",
+                    job_id,
+                    f"Company {rng.randint(1, 500)}",
+                    f"ref{rng.randint(1, 10**9)}",
+                    f"City {rng.randint(1, 80)}, {country.upper()}",
+                    f"2026-01-{rng.randint(1, 15):02d}T{rng.randint(0, 23):02d}:00:00Z",
+                    role,
+                ])
+
+
+def timed(label: str, fn, *args, **kwargs) -> float:
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        start = time.perf_counter()
+        fn(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+    print(f"{label:<44}{elapsed:>9.2f} s")
+    return elapsed
+
+
+def merge_row_dicts(interim_dir: Path, output_file: Path):
+    """The previous merge_csv_files: one dict per row through DictReader/DictWriter."""
+    csv_files = sorted(f for f in interim_dir.glob("*_jobs.csv") if f.name != output_file.name)
+    with open(csv_files[0], "r", encoding="utf-8", newline="") as f:
+        fieldnames = ["country_code"] + next(csv.reader(f))
+    with open(output_file, "w", encoding="utf-8", newline="") as master_f:
+        writer = csv.DictWriter(master_f, fieldnames=fieldnames, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        for csv_f in csv_files:
+            with open(csv_f, "r", encoding="utf-8", newline="") as f:
+                for row in csv.DictReader(f):
+                    row["country_code"] = csv_f.name.split("_")[0]
+                    writer.writerow(row)
+
+
+def group_in_memory(merged_file: Path) -> int:
+    """What downstream id-level code must do with unordered output: hold every row in a dict."""
+    groups = defaultdict(list)
+    with open(merged_file, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            groups[row["id"]].append(row)
+    return len(groups)
+
+
+def group_linear(merged_file: Path) -> int:
+    return sum(1 for _ in iter_id_groups(merged_file))
+
+
+def row_counter(path: Path) -> Counter:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return Counter(tuple(row) for row in csv.reader(f))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the row-dict, list and external-sort merges")
+    parser.add_argument("--files", type=int, default=20, help="Interim CSVs to generate. Default: 20")
+    parser.add_argument("--rows-per-file", type=int, default=20000, help="Rows per interim CSV. Default: 20000")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Rows held in memory before spilling a sorted run. Default: 100000")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes. Default: CPU count")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench_merge_") as tmp:
+        interim_dir = Path(tmp)
+        generate_interim(interim_dir, args.files, args.rows_per_file)
+        print(f"Generated {args.files} files x {args.rows_per_file} rows (workers={args.workers}, cpus={os.cpu_count()})\n")
+
+        dict_out = interim_dir / "row_dict_merged.csv"
+        list_out = interim_dir / "list_merged.csv"
+        sorted_out = interim_dir / "all_jobs_merged.csv"
+
+        row_dicts = timed("row-dict merge (previous merge_csv_files)", merge_row_dicts, interim_dir, dict_out)
+        baseline = timed("list merge (merge_csv_files)", merge_csv_files, interim_dir, list_out)
+        serial = timed("external sort, 1 worker", merge_csv_files_sorted, interim_dir, sorted_out,
+                       workers=1, chunk_rows=args.chunk_rows)
+        spilled = timed(f"external sort, 1 worker, {args.chunk_rows // 10} rows/run",
+                        merge_csv_files_sorted, interim_dir, sorted_out, workers=1, chunk_rows=max(args.chunk_rows // 10, 1))
+        parallel = serial
+        if args.workers > 1:
+            parallel = timed(f"external sort, {args.workers} workers", merge_csv_files_sorted, interim_dir, sorted_out,
+                             workers=args.workers, chunk_rows=args.chunk_rows)
+
+        grouped_dict = timed("id grouping, in-memory dict", group_in_memory, list_out)
+        grouped_scan = timed("id grouping, linear scan (iter_id_groups)", group_linear, sorted_out)
+
+        seen = set()
+        for job_id, _ in iter_id_groups(sorted_out):
+            if job_id in seen:
+                print(f"❌ id {job_id} is not clustered in the sorted output.")
+                return 1
+            seen.add(job_id)
+
+        expected = row_counter(dict_out)
+        if row_counter(list_out) != expected or row_counter(sorted_out) != expected:
+            print("❌ The merges do not contain the same rows.")
+            return 1
+
+        best = min(serial, parallel)
+        print(f"\nvs row-dict merge:   list {row_dicts / baseline:.2f}x, sorted {row_dicts / best:.2f}x")
+        print(f"vs list merge:       {baseline / serial:.2f}x (1 worker), {baseline / spilled:.2f}x (spilling), "
+              f"{baseline / parallel:.2f}x ({args.workers} workers)")
+        print(f"Merge + id grouping: {(baseline + grouped_dict) / (best + grouped_scan):.2f}x vs list merge + dict")
+        if serial > baseline:
+            print("⚠️  The sorted merge is slower than the list merge on this run.")
+        if (os.cpu_count() or 1) < 2:
+            print("⚠️  Only 1 CPU available: the parallel phases cannot show a speedup here.")
+        print("✅ Same rows, clustered by id.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -51,12 +52,15 @@ def run_preliminary_eda(input_path: Path):
     # Return df for future steps if needed (though this script runs as main)
     return df
 
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the preliminary EDA over the merged dataset")
+    parser.add_argument("--input", default="data/interim/all_jobs_merged.csv", help="Merged CSV to analyse")
+    args = parser.parse_args(argv)
+
+    df_cleaned = run_preliminary_eda(Path(args.input))
+    return 0 if df_cleaned is not None else 1
+
 if __name__ == "__main__":
-    input_csv = Path("data/interim/all_jobs_merged.csv")
-    df_cleaned = run_preliminary_eda(input_csv)
-    
-    # Optional: Save a intermediate check-point if desired, 
-    # but the user didn't explicitly ask to save yet, just to "create file and proceed"
-    # output_csv = Path("data/interim/all_jobs_pre_eda.csv")
-    # df_cleaned.to_csv(output_csv, index=False)
-    # print(f"\n[SAVE] Preliminary cleaned data saved to {output_csv}")
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unified CLI (Data Quality Hell project)
+
+Single entry point for every pipeline stage:
+
+    python src/dqh.py <command> [stage options]
+    python src/dqh.py flatten --start-date 2026-01-01 --end-date 2026-01-15
+
+Stage modules are imported only when their command runs, so pandas/numpy/requests
+are never loaded by commands that don't need them. Stages run in-process via their
+main(argv); use run() to call them from a notebook or another script.
+"""
+
+import os
+import sys
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# command -> (stage directory, module, description)
+COMMANDS = {
+    "countries": ("ingestion", "fetch_countries", "Fetch the Adzuna country list"),
+    "fetch": ("ingestion", "fetch_raw", "Fetch RAW job ads for one country/search"),
+    "bulk": ("ingestion", "run_bulk_ingestion", "Bulk fetch job ads for multiple countries"),
+    "tech": ("ingestion", "run_tech_ingestion", "Fetch the specialized tech roles for every country"),
+    "flatten": ("processing", "flatten_raw", "Flatten RAW snapshots to per-country CSVs"),
+    "merge": ("processing", "merge_data", "Merge interim CSVs into the master CSV"),
+    "cube": ("processing", "build_cube", "Materialize the aggregate cubes"),
+    "eda": ("analysis", "eda_preliminary", "Run the preliminary EDA"),
+}
+
+
+def load_stage(command: str):
+    """Imports the stage module behind a command (stage directories go on sys.path, like running the script directly)."""
+    stage_dir, module_name, _ = COMMANDS[command]
+    path = os.path.join(_SRC_DIR, stage_dir)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+    import importlib
+    return importlib.import_module(module_name)
+
+
+def run(command: str, argv=None) -> int:
+    """Runs a stage in the current interpreter and returns its exit code."""
+    if command not in COMMANDS:
+        raise ValueError(f"Unknown command '{command}'. Choose from: {', '.join(COMMANDS)}")
+
+    stage = load_stage(command)
+
+    # Stage parsers take their prog from sys.argv[0]; show "dqh <command>" in usage/errors
+    saved_argv0 = sys.argv[0] if sys.argv else None
+    sys.argv[:1] = [f"dqh {command}"]
+    try:
+        code = stage.main(list(argv or []))
+    finally:
+        if saved_argv0 is None:
+            del sys.argv[:1]
+        else:
+            sys.argv[0] = saved_argv0
+    return code or 0
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    epilog = "commands:\n" + "\n".join(f"  {name:<10} {desc}" for name, (_, _, desc) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        prog="dqh",
+        description="Data Quality Hell pipeline CLI",
+        epilog=epilog + "\n\nRun 'dqh <command> --help' for the options of each stage.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("command", choices=list(COMMANDS), metavar="command", help="Pipeline stage to run")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Options forwarded to the stage")
+    args = parser.parse_args(argv)
+
+    return run(args.command, args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -55,5 +55,12 @@ def fetch_countries():
     print(f"✅ Country list saved to {output_file}")
     return 0
 
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fetch the Adzuna supported country list")
+    parser.parse_args(argv)
+    return fetch_countries()
+
 if __name__ == "__main__":
-    sys.exit(fetch_countries())
+    sys.exit(main())
@@ -21,7 +21,7 @@ import time
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import requests
 from dotenv import load_dotenv
@@ -109,7 +109,7 @@ def fetch_page(
     raise RuntimeError("Unreachable")
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     parser = argparse.ArgumentParser(description="Fetch RAW job ads from Adzuna API")
     parser.add_argument("--country", default="es", help="Country code (e.g. es, gb, us). Default: es")
     parser.add_argument("--what", default="data", help="Search keywords for job ads. Default: data")
@@ -119,7 +119,7 @@ def main() -> int:
     parser.add_argument("--sort-by", default="date", choices=["date", "relevance", "salary"], help="Sort. Default: date")
     parser.add_argument("--max-days-old", type=int, default=None, help="Include jobs up to X days old")
     parser.add_argument("--sleep-seconds", type=float, default=3.0, help="Throttle between requests. Default: 3.0")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     app_id = os.getenv("ADZUNA_APP_ID")
     app_key = os.getenv("ADZUNA_APP_KEY")
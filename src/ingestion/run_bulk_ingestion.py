@@ -3,7 +3,7 @@
 Bulk Ingestion Orchestrator (Data Quality Hell project)
 
 Iterates over countries in data/reference/countries.json and calls fetch_raw.py
-for each one.
+for each one, either as a subprocess (default) or in-process with --in-process.
 """
 
 import json
@@ -12,15 +12,16 @@ import sys
 import argparse
 from pathlib import Path
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Bulk fetch job ads for multiple countries")
     parser.add_argument("--pages", type=int, default=1, help="Pages per country. Default: 1")
     parser.add_argument("--results-per-page", type=int, default=50, help="Results per page. Default: 50")
     parser.add_argument("--what", default="data", help="Search keywords. Default: data")
     parser.add_argument("--max-days-old", type=int, default=None, help="Include jobs up to X days old")
     parser.add_argument("--limit", type=int, default=None, help="Limit number of countries to process (for testing)")
+    parser.add_argument("--in-process", action="store_true", help="Call fetch_raw.main() directly instead of spawning a Python process per country")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     countries_file = Path("data/reference/countries.json")
     if not countries_file.exists():
@@ -37,6 +38,9 @@ def main():
     print(f"Settings: pages={args.pages}, results-per-page={args.results_per_page}, what='{args.what}'")
     
     script_path = Path("src/ingestion/fetch_raw.py")
+    if args.in_process:
+        # Imported here so the subprocess path never pays for requests/dotenv
+        import fetch_raw
 
     for idx, country_info in enumerate(countries, 1):
         code = country_info["code"]
@@ -44,9 +48,7 @@ def main():
         
         print(f"\n[{idx}/{len(countries)}] Processing {name} ({code.upper()})...")
         
-        cmd = [
-            sys.executable,
-            str(script_path),
+        fetch_args = [
             "--country", code,
             "--what", args.what,
             "--pages", str(args.pages),
@@ -54,8 +56,21 @@ def main():
         ]
         
         if args.max_days_old:
-            cmd.extend(["--max-days-old", str(args.max_days_old)])
+            fetch_args.extend(["--max-days-old", str(args.max_days_old)])
         
+        if args.in_process:
+            # SystemExit covers argparse rejecting the arguments inside fetch_raw.main
+            try:
+                returncode = fetch_raw.main(fetch_args)
+                if returncode == 0:
+                    print(f"Success for {name}")
+                else:
+                    print(f"Error for {name}: fetch_raw exited with code {returncode} (details above)")
+            except (Exception, SystemExit) as e:
+                print(f"Critical error for {name}: {type(e).__name__}: {e}")
+            continue
+        
+        cmd = [sys.executable, str(script_path)] + fetch_args
         try:
             # We use check=True to stop if one fails, but maybe we want to continue?
             # For data quality hell, let's continue but log errors.
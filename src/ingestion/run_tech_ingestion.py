@@ -4,7 +4,17 @@ import sys
 import time
 from pathlib import Path
 
-def main():
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fetch the specialized tech roles for every country")
+    parser.add_argument("--in-process", action="store_true", help="Call fetch_raw.main() directly instead of spawning a Python process per query")
+    args = parser.parse_args(argv)
+
+    if args.in_process:
+        # Imported here so the subprocess path never pays for requests/dotenv
+        import fetch_raw
+
     # Roles to fetch
     tech_roles = [
         "Data Engineer",
@@ -43,10 +53,9 @@ def main():
             
             print(f"[{current_step}/{total_steps}] Fetching '{role}' for {name} ({code})...")
             
-            # Build command
+            # Build arguments
             # Using --what to specify the exact tech role
-            cmd = [
-                sys.executable, "src/ingestion/fetch_raw.py",
+            fetch_args = [
                 "--country", code,
                 "--pages", str(pages),
                 "--results-per-page", str(results_per_page),
@@ -54,14 +63,24 @@ def main():
                 "--what", role
             ]
             
-            # Execute fetch_raw.py
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            # Execute fetch_raw (same interpreter or a fresh one)
+            if args.in_process:
+                # SystemExit covers argparse rejecting the arguments inside fetch_raw.main
+                try:
+                    returncode = fetch_raw.main(fetch_args)
+                    error = f"fetch_raw exited with code {returncode} (details above)"
+                except (Exception, SystemExit) as e:
+                    returncode, error = 1, f"{type(e).__name__}: {e}"
+            else:
+                cmd = [sys.executable, "src/ingestion/fetch_raw.py"] + fetch_args
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                returncode, error = result.returncode, result.stderr
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print(f"   ✅ Success for {code}")
             else:
                 print(f"   ❌ Failed for {code}")
-                print(f"   Error: {result.stderr}")
+                print(f"   Error: {error}")
             
             # Brief pause to be respectful to the API between countries
             time.sleep(1)
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Aggregate Cube Materializer (Data Quality Hell project)
+
+1. Scans the per-country/role CSVs in data/interim/ (the same inputs as merge_data.py)
+2. Skips files whose sha256 is unchanged since the last run (see cube_manifest.json)
+3. Keeps what each file contributed to each job id in one state file per source
+   (sources/<interim file>), so a changed or deleted file retracts its old rows
+   before its new ones are folded in
+4. Updates the pre-aggregated cubes in place, touching only the job ids that changed:
+   - jobs_cube.csv: country_code x primary_role x created_day x company -> jobs
+   - role_combinations.csv: matched_roles -> jobs
+5. Saves everything under data/processed/cube/ by building the new state in a
+   staging directory and swapping it in, so a crash never leaves a partial update
+
+A run writes the cubes and the state files of the changed sources only. It still
+reads the state files of the unchanged sources, keeping just the touched ids:
+a job id can appear in several files, and its cube cell depends on all of them.
+
+Notebooks and dashboards read the cubes instead of re-running groupby over the
+row-level merged dataset.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+ROLE_SEPARATOR = "|"
+UNKNOWN_COMPANY = "Unknown"
+
+SOURCES_DIR = "sources"
+SOURCE_FIELDS = ["id", "company", "created_day", "title", "matched_roles"]
+CUBE_FIELDS = ["country_code", "primary_role", "created_day", "company", "jobs"]
+COMBO_FIELDS = ["matched_roles", "role_count", "jobs"]
+CUBE_FILES = ["jobs_cube.csv", "role_combinations.csv"]
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def classify_role(title: str, roles) -> str:
+    """Same primary-role rules as the deep analysis notebook."""
+    title = str(title).lower()
+
+    if 'scientist' in title or 'science' in title or 'Data Scientist' in roles:
+        return 'Data Scientist'
+    if 'engineer' in title or 'engineering' in title or 'Data Engineer' in roles or 'Mlops' in roles:
+        return 'Data Engineer'
+    if 'analyst' in title or 'analytics' in title or 'Data Analyst' in roles:
+        return 'Data Analyst'
+    if 'architect' in title or 'Data Architect' in roles:
+        return 'Data Architect'
+    if 'lead' in title or 'manager' in title or 'head' in title or 'director' in title:
+        return 'Management/Lead'
+
+    return 'General Data/Other'
+
+
+def created_day(created_str: str) -> str:
+    """Returns the YYYY-MM-DD part of an Adzuna timestamp, or '' if malformed."""
+    day = created_str[:10]
+    try:
+        date.fromisoformat(day)
+    except ValueError:
+        return ""
+    return day
+
+
+def read_source(csv_f: Path) -> dict:
+    """
+    Reads one interim CSV into its per-id contributions.
+    The first row of an id keeps its attributes (like drop_duplicates within the file);
+    every row adds its search_term to the id's role set.
+    """
+    contributions = {}
+    with open(csv_f, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            entry = contributions.get(row["id"])
+            if entry is None:
+                entry = {
+                    "company": row["company"] or UNKNOWN_COMPANY,
+                    "created_day": created_day(row["created"]),
+                    "title": row["title"],
+                    "roles": set(),
+                }
+                contributions[row["id"]] = entry
+            if row["search_term"]:
+                entry["roles"].add(row["search_term"])
+    return contributions
+
+
+def job_view(sources: dict):
+    """
+    Resolves one job id from its per-source contributions, or None if no source has it.
+    Attributes come from the first source in sorted file order (the merge order the
+    notebook deduplicates on); roles are the union over all sources.
+    """
+    if not sources:
+        return None
+    first = min(sources)
+    return {
+        "country_code": first.split("_")[0],
+        "company": sources[first]["company"],
+        "created_day": sources[first]["created_day"],
+        "title": sources[first]["title"],
+        "roles": set().union(*(entry["roles"] for entry in sources.values())),
+    }
+
+
+def cube_key(job: dict) -> tuple:
+    return (job["country_code"], classify_role(job["title"], job["roles"]), job["created_day"], job["company"])
+
+
+def combo_key(job: dict) -> str:
+    return ROLE_SEPARATOR.join(sorted(job["roles"]))
+
+
+def read_state_source(path: Path, ids=None) -> dict:
+    """Reads one source's stored contributions, optionally only those of the given ids."""
+    entries = {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            job_id = row.pop("id")
+            if ids is not None and job_id not in ids:
+                continue
+            roles = row.pop("matched_roles")
+            row["roles"] = set(roles.split(ROLE_SEPARATOR)) if roles else set()
+            entries[job_id] = row
+    return entries
+
+
+def write_state_source(path: Path, entries: dict):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+        writer.writerow(SOURCE_FIELDS)
+        for job_id in sorted(entries):
+            entry = entries[job_id]
+            writer.writerow([
+                job_id, entry["company"], entry["created_day"],
+                entry["title"], ROLE_SEPARATOR.join(sorted(entry["roles"])),
+            ])
+
+
+def _backup_dir(cube_dir: Path) -> Path:
+    return cube_dir.with_name(f".{cube_dir.name}_previous")
+
+
+def recover_state(cube_dir: Path):
+    """
+    Cleans up after an interrupted save_state: drops leftover staging directories
+    and puts the previous state back if the run died between the two renames.
+    """
+    if cube_dir.parent.exists():
+        for staging in cube_dir.parent.glob(f".{cube_dir.name}_staging_*"):
+            shutil.rmtree(staging, ignore_errors=True)
+
+    backup = _backup_dir(cube_dir)
+    if backup.exists():
+        if cube_dir.exists():
+            shutil.rmtree(backup)
+        else:
+            os.replace(backup, cube_dir)
+            print(f"⚠️  Restored {cube_dir} from an interrupted update.")
+
+
+def load_state(cube_dir: Path):
+    """Loads both cubes and the source manifest (empty on first run)."""
+    cube = Counter()
+    combos = Counter()
+    manifest = {}
+
+    cube_file = cube_dir / "jobs_cube.csv"
+    if cube_file.exists():
+        with open(cube_file, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                key = (row["country_code"], row["primary_role"], row["created_day"], row["company"])
+                cube[key] = int(row["jobs"])
+
+    combo_file = cube_dir / "role_combinations.csv"
+    if combo_file.exists():
+        with open(combo_file, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                combos[row["matched_roles"]] = int(row["jobs"])
+
+    manifest_file = cube_dir / "cube_manifest.json"
+    if manifest_file.exists():
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8")).get("sources", {})
+
+    return cube, combos, manifest
+
+
+def apply_deltas(before: dict, contributions: dict, cube: Counter, combos: Counter):
+    """Moves each touched id's contribution from its old cube cells to its new ones."""
+    for job_id, old in before.items():
+        if old is not None:
+            cube[cube_key(old)] -= 1
+            combos[combo_key(old)] -= 1
+        new = job_view(contributions.get(job_id))
+        if new is not None:
+            cube[cube_key(new)] += 1
+            combos[combo_key(new)] += 1
+
+    # Drop cells emptied by the update so the cube stays compact
+    for counter in (cube, combos):
+        for key in [k for k, v in counter.items() if v <= 0]:
+            del counter[key]
+
+
+def save_state(cube_dir: Path, cube: Counter, combos: Counter, manifest: dict, changed: dict):
+    """
+    Writes the new state to a staging directory next to cube_dir and swaps it in.
+    Only the changed sources' state files are written; the others are hard-linked
+    from the current state. The manifest is written last, and the swap is two
+    renames (recovered by recover_state if interrupted between them).
+    """
+    cube_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{cube_dir.name}_staging_", dir=cube_dir.parent))
+
+    try:
+        (staging / SOURCES_DIR).mkdir()
+        for name in sorted(manifest):
+            target = staging / SOURCES_DIR / name
+            if name in changed:
+                write_state_source(target, changed[name])
+                continue
+            try:
+                os.link(cube_dir / SOURCES_DIR / name, target)
+            except OSError:
+                shutil.copy2(cube_dir / SOURCES_DIR / name, target)
+
+        with open(staging / "jobs_cube.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            writer.writerow(CUBE_FIELDS)
+            for key, jobs in sorted(cube.items()):
+                writer.writerow([*key, jobs])
+
+        with open(staging / "role_combinations.csv", "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            writer.writerow(COMBO_FIELDS)
+            for roles, jobs in sorted(combos.items(), key=lambda x: (-x[1], x[0])):
+                role_count = len(roles.split(ROLE_SEPARATOR)) if roles else 0
+                writer.writerow([roles, role_count, jobs])
+
+        (staging / "cube_manifest.json").write_text(
+            json.dumps(
+                {
+                    "updated_utc": datetime.now(timezone.utc).isoformat(),
+                    "unique_jobs": sum(cube.values()),
+                    "cube_cells": len(cube),
+                    "sources": dict(sorted(manifest.items())),
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    backup = _backup_dir(cube_dir)
+    if cube_dir.exists():
+        os.replace(cube_dir, backup)
+    os.replace(staging, cube_dir)
+    shutil.rmtree(backup, ignore_errors=True)
+
+
+def build_cube(interim_dir: Path, cube_dir: Path, rebuild: bool = False):
+    """
+    Incrementally materializes the aggregate cubes from the interim CSVs.
+    A changed or deleted file first retracts everything it contributed before,
+    then its current rows (if any) are folded back in.
+    """
+    recover_state(cube_dir)
+
+    if rebuild:
+        cube, combos, manifest = Counter(), Counter(), {}
+    else:
+        cube, combos, manifest = load_state(cube_dir)
+        if manifest and not (cube_dir / SOURCES_DIR).is_dir():
+            print("⚠️  Cube state has no per-source files (older layout). Rebuilding from scratch.")
+            cube, combos, manifest = Counter(), Counter(), {}
+            rebuild = True
+
+    csv_files = sorted(f for f in interim_dir.glob("*_jobs.csv") if f.name != "all_jobs_merged.csv")
+    if not csv_files and not manifest and not rebuild:
+        print("No country CSV files found to aggregate.")
+        return
+
+    current = {csv_f.name: (csv_f, sha256_file(csv_f)) for csv_f in csv_files}
+    changed = [name for name, (_, digest) in current.items() if manifest.get(name) != digest]
+    removed = sorted(name for name in manifest if name not in current)
+
+    if not changed and not removed and not rebuild:
+        print("✨ Cube is up to date. Nothing to fold.")
+        return
+
+    # What the changed/removed sources contributed last time, and what the changed ones contribute now
+    stale = {
+        name: read_state_source(cube_dir / SOURCES_DIR / name)
+        for name in sorted(set(changed) | set(removed))
+        if name in manifest
+    }
+    folded = {}
+    for name in changed:
+        folded[name] = read_source(current[name][0])
+        print(f"  Folded {len(folded[name])} job ids from {name}")
+    for name in removed:
+        print(f"  Retracted {name} (file removed)")
+
+    touched = set().union(*stale.values(), *folded.values())
+
+    # The other sources of a touched id decide its first source and role union too
+    contributions = {}
+    if touched:
+        for name in sorted(manifest):
+            if name not in stale:
+                for job_id, entry in read_state_source(cube_dir / SOURCES_DIR / name, touched).items():
+                    contributions.setdefault(job_id, {})[name] = entry
+    for name, entries in stale.items():
+        for job_id, entry in entries.items():
+            contributions.setdefault(job_id, {})[name] = entry
+
+    before = {job_id: job_view(contributions.get(job_id)) for job_id in touched}
+
+    for name, entries in stale.items():
+        for job_id in entries:
+            del contributions[job_id][name]
+    for name, entries in folded.items():
+        for job_id, entry in entries.items():
+            contributions.setdefault(job_id, {})[name] = entry
+
+    apply_deltas(before, contributions, cube, combos)
+
+    for name in removed:
+        del manifest[name]
+    for name in changed:
+        manifest[name] = current[name][1]
+    save_state(cube_dir, cube, combos, manifest, folded)
+
+    print(f"\n✅ Refreshed {len(changed)} changed and {len(removed)} removed files ({len(before)} job ids touched).")
+    print(f"   Cube: {sum(cube.values())} unique jobs in {len(cube)} cells, {len(combos)} role combinations.")
+
+
+def verify_cube(interim_dir: Path, cube_dir: Path) -> bool:
+    """Rebuilds the cubes from scratch in a temp dir and checks they are byte-identical to cube_dir."""
+    import contextlib
+    import io
+
+    def read(path: Path):
+        return path.read_bytes() if path.exists() else None
+
+    with tempfile.TemporaryDirectory(prefix="cube_verify_") as tmp:
+        rebuilt_dir = Path(tmp) / "cube"
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_cube(interim_dir, rebuilt_dir, rebuild=True)
+        mismatched = [name for name in CUBE_FILES if read(cube_dir / name) != read(rebuilt_dir / name)]
+
+    if mismatched:
+        print(f"❌ Incremental cube differs from a full rebuild: {', '.join(mismatched)}")
+        return False
+    print("✅ Incremental cube is byte-identical to a full rebuild.")
+    return True
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Materialize aggregate cubes from interim CSVs")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the existing cube and rebuild from scratch")
+    parser.add_argument("--verify", action="store_true", help="After updating, check the cube against a full rebuild")
+    args = parser.parse_args(argv)
+
+    interim_dir = Path("data/interim")
+    cube_dir = Path("data/processed/cube")
+
+    if not interim_dir.exists():
+        print(f"ERROR: {interim_dir} does not exist.")
+        return 1
+
+    build_cube(interim_dir, cube_dir, rebuild=args.rebuild)
+    if args.verify and not verify_cube(interim_dir, cube_dir):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,7 +16,6 @@ import shutil
 import sys
 from pathlib import Path
 from collections import defaultdict
-import pandas as pd
 
 def cleanup_snapshots(raw_dir: Path):
     """Keeps only the latest snapshot for each country and specific search term."""
@@ -57,7 +56,9 @@ def flatten_data(latest_snapshots: dict, interim_dir: Path, start_date: str = No
     """Extracts job data and saves to CSV with optional date filtering."""
     interim_dir.mkdir(parents=True, exist_ok=True)
     
-    # Parse dates if provided
+    # Parse dates if provided (pandas is only needed for date filtering, so import it lazily)
+    if start_date or end_date:
+        import pandas as pd
     s_date = pd.to_datetime(start_date).tz_localize('UTC') if start_date else None
     e_date = (pd.to_datetime(end_date) + pd.Timedelta(hours=23, minutes=59, seconds=59)).tz_localize('UTC') if end_date else None
 
@@ -131,13 +132,13 @@ def flatten_data(latest_snapshots: dict, interim_dir: Path, start_date: str = No
         except Exception as e:
             print(f"   ❌ Error writing CSV for {country}: {e}")
 
-def main():
+def main(argv=None):
     import argparse
     
     parser = argparse.ArgumentParser(description="Flatten Adzuna RAW snapshots to CSV")
     parser.add_argument("--start-date", help="Filter jobs created starting from this date (YYYY-MM-DD)")
     parser.add_argument("--end-date", help="Filter jobs created up to this date (YYYY-MM-DD)")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     raw_dir = Path("data/raw")
     interim_dir = Path("data/interim")
@@ -4,12 +4,129 @@ Data Merger (Data Quality Hell project)
 
 Consolidates all per-country CSV files from data/interim/ into a single
 master CSV file and adds a 'country_code' column.
+
+With --sort-by-id the master CSV is sorted by job id through an external
+(spill-to-disk) merge sort. Rows are buffered as (id, CSV line) records, reusing
+the source lines where possible, up to --chunk-rows; if everything fits, the
+buffer is sorted and written directly. Otherwise sorted runs are spilled to disk
+and merged back one id range at a time, so memory stays bounded by --chunk-rows.
+With --workers > 1 the files are spilled and the id ranges merged in worker
+processes. Id-level grouping of the output becomes a linear scan (see
+iter_id_groups).
 """
 
 import csv
+import gc
+import marshal
+import os
+import shutil
+import struct
 import sys
+import tempfile
+from bisect import bisect_left
+from contextlib import contextmanager
+from itertools import chain, groupby, islice, repeat, tee
+from operator import add, itemgetter
 from pathlib import Path
 
+# Maximum number of sorted runs opened at once during the final merge
+MAX_OPEN_RUNS = 128
+# Rows parsed and validated per block
+READ_BLOCK_ROWS = 1024
+# Records per length-prefixed marshal block in a run file
+RUN_BLOCK_ROWS = 1024
+# Encoded lines joined into one write() call
+WRITE_BATCH_ROWS = 4096
+_BLOCK_HEADER = struct.Struct("<I")
+
+
+def _source_positions(csv_f: Path, header: list, fieldnames: list):
+    """
+    Positions of the fieldnames columns in [country_code] + header (None for a
+    missing column), or None if the file is already laid out like fieldnames.
+    """
+    source_fields = ["country_code"] + header
+    extra = set(source_fields) - set(fieldnames)
+    if extra:
+        raise ValueError(f"{csv_f.name} has fields not in the master header: {sorted(extra)}")
+    if source_fields == fieldnames:
+        return None
+    return [source_fields.index(name) if name in source_fields else None for name in fieldnames]
+
+
+def _normalize_block(block: list, csv_f: Path, first_row: int, country_code: str, width: int, positions) -> list:
+    """
+    Lays out parsed rows like fieldnames, with the same contract as the original
+    DictReader/DictWriter merge: missing columns and short rows are padded with "",
+    blank rows are skipped, and values beyond the header raise ValueError.
+    first_row is the data row number of block[0], for error messages.
+    """
+    rows = []
+    for row_num, row in enumerate(block, first_row):
+        if len(row) != width:
+            if not row:
+                continue
+            if len(row) > width:
+                raise ValueError(f"{csv_f.name} row {row_num}: {len(row)} fields, header has {width}")
+            row = row + [""] * (width - len(row))
+        row = [country_code, *row]
+        if positions is not None:
+            row = [row[i] if i is not None else "" for i in positions]
+        rows.append(row)
+    return rows
+
+
+def _read_blocks(csv_f: Path, fieldnames: list, block_rows: int, with_lines: bool = False):
+    """
+    Yields the rows of one interim CSV in blocks of up to block_rows, laid out like
+    fieldnames with the country_code (from the file name) prepended.
+    Blocks where every row already matches the header take a path with no
+    per-row Python code; the rest go through _normalize_block.
+    With with_lines, yields (rows, lines): lines are the block's source lines if
+    every row is exactly one unchanged line, so they can be reused instead of
+    re-encoding the rows, and None otherwise.
+    """
+    country_code = csv_f.name.split("_")[0]
+
+    with open(csv_f, "r", encoding="utf-8", newline="") as f:
+        source, raw_lines = tee(f) if with_lines else (f, None)
+        reader = csv.reader(source)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        positions = _source_positions(csv_f, header, fieldnames)
+        width = len(header)
+        lines_read = reader.line_num
+        if with_lines:
+            list(islice(raw_lines, lines_read))
+        row_num = 1
+
+        while True:
+            block = list(islice(reader, block_rows))
+            if not block:
+                return
+            intact = positions is None and set(map(len, block)) == {width}
+            if intact:
+                rows = list(map(add, repeat([country_code]), block))
+            else:
+                rows = _normalize_block(block, csv_f, row_num, country_code, width, positions)
+            row_num += len(block)
+
+            if not with_lines:
+                yield rows
+                continue
+            lines = list(islice(raw_lines, reader.line_num - lines_read))
+            lines_read = reader.line_num
+            yield rows, (lines if intact and len(lines) == len(rows) else None)
+
+
+def _master_fieldnames(csv_f: Path) -> list:
+    """The first file defines the master header: country_code + its columns."""
+    with open(csv_f, "r", encoding="utf-8", newline="") as f:
+        return ["country_code"] + next(csv.reader(f), [])
+
+
 def merge_csv_files(interim_dir: Path, output_file: Path):
     """Merges all country-specific CSVs into a single master file."""
     csv_files = sorted([f for f in interim_dir.glob("*_jobs.csv") if f.name != output_file.name])
@@ -20,39 +137,383 @@ def merge_csv_files(interim_dir: Path, output_file: Path):
 
     print(f"Merging {len(csv_files)} files into {output_file.name}...")
     
-    first_file = True
+    # Prepare fieldnames: add country_code at the beginning
+    fieldnames = _master_fieldnames(csv_files[0])
     total_rows = 0
     
     with open(output_file, "w", encoding="utf-8", newline="") as master_f:
-        writer = None
+        writer = csv.writer(master_f, quoting=csv.QUOTE_ALL)
+        writer.writerow(fieldnames)
         
         for csv_f in csv_files:
             country_code = csv_f.name.split("_")[0]
             print(f"  Processing {csv_f.name} ({country_code.upper()})...")
             
-            with open(csv_f, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                
-                if first_file:
-                    # Prepare fieldnames: add country_code at the beginning
-                    fieldnames = ["country_code"] + reader.fieldnames
-                    writer = csv.DictWriter(master_f, fieldnames=fieldnames, quoting=csv.QUOTE_ALL)
-                    writer.writeheader()
-                    first_file = False
-                
+            rows_in_file = 0
+            for rows in _read_blocks(csv_f, fieldnames, READ_BLOCK_ROWS):
+                writer.writerows(rows)
+                rows_in_file += len(rows)
+            
+            total_rows += rows_in_file
+            print(f"    Added {rows_in_file} rows.")
+
+    print(f"\n✅ Successfully merged {total_rows} total rows into {output_file.name}")
+
+
+class _LineBuffer(list):
+    """csv.writer target that collects the encoded lines instead of writing them."""
+    write = list.append
+
+
+def _encoded_blocks(csv_f: Path, fieldnames: list, block_rows: int):
+    """
+    Yields the rows of one interim CSV as lists of (id, CSV line) records.
+    Intact source lines are reused with the country_code field prepended; other
+    blocks are re-encoded right after parsing, while their fields are still in
+    cache. Sorting and writing the records later only moves whole lines around.
+    """
+    get_id = itemgetter(fieldnames.index("id"))
+    country_field = '"{}",'.format(csv_f.name.split("_")[0].replace('"', '""'))
+
+    for rows, lines in _read_blocks(csv_f, fieldnames, block_rows, with_lines=True):
+        if lines is None:
+            lines = _LineBuffer()
+            csv.writer(lines, quoting=csv.QUOTE_ALL).writerows(rows)
+        else:
+            # Only the last line of a file can lack its terminator
+            if not lines[-1].endswith(("\n", "\r")):
+                lines[-1] += "\r\n"
+            lines = map(country_field.__add__, lines)
+        yield list(zip(map(get_id, rows), lines))
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Pauses the cyclic garbage collector while large record buffers are alive.
+    Records are tuples of strings and cannot form cycles, but every allocation
+    counts towards a collection pass that would rescan the whole buffer.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _write_records(f, records: list) -> int:
+    """Writes id-sorted records that no id crosses, returning their number of unique ids."""
+    for start in range(0, len(records), WRITE_BATCH_ROWS):
+        f.write("".join(map(itemgetter(1), records[start:start + WRITE_BATCH_ROWS])))
+    return len(set(map(itemgetter(0), records)))
+
+
+def _write_run(run_path: Path, run_key: tuple, records) -> tuple:
+    """
+    Writes id-sorted records as length-prefixed marshal blocks.
+    Returns the run descriptor (path, run_key, block first ids, block offsets).
+    """
+    first_ids = []
+    offsets = []
+    records = iter(records)
+
+    with open(run_path, "wb") as f:
+        while True:
+            block = list(islice(records, RUN_BLOCK_ROWS))
+            if not block:
+                break
+            first_ids.append(block[0][0])
+            offsets.append(f.tell())
+            data = marshal.dumps(block)
+            f.write(_BLOCK_HEADER.pack(len(data)))
+            f.write(data)
+
+    return run_path, run_key, first_ids, offsets
+
+
+class _RunCursor:
+    """Reads a run forward, handing out its records one id range at a time."""
+
+    def __init__(self, run: tuple, lo: str = None):
+        run_path, _, first_ids, offsets = run
+        self.first_ids = first_ids
+        self.offsets = offsets
+        self.records = []
+        self.ids = []
+        self.pos = 0
+        # A block starting at lo may be preceded by one that ends with lo, hence the -1
+        self.next_block = max(bisect_left(first_ids, lo) - 1, 0) if lo is not None else 0
+        self.f = open(run_path, "rb")
+        if self.next_block < len(offsets):
+            self.f.seek(offsets[self.next_block])
+        if lo is not None:
+            self.take_below(lo)
+
+    def _load_block(self) -> bool:
+        if self.next_block >= len(self.offsets):
+            return False
+        (size,) = _BLOCK_HEADER.unpack(self.f.read(_BLOCK_HEADER.size))
+        self.records = marshal.loads(self.f.read(size))
+        self.ids = list(map(itemgetter(0), self.records))
+        self.pos = 0
+        self.next_block += 1
+        return True
+
+    def take_below(self, hi: str = None) -> list:
+        """Returns the next records with id < hi (all remaining records if hi is None)."""
+        out = []
+        while True:
+            if self.pos >= len(self.records):
+                # Don't read ahead into a block that starts at or after hi
+                if hi is not None and self.next_block < len(self.first_ids) and self.first_ids[self.next_block] >= hi:
+                    return out
+                if not self._load_block():
+                    return out
+            if hi is None or self.ids[-1] < hi:
+                out.extend(self.records[self.pos:])
+                self.pos = len(self.records)
+                continue
+            end = bisect_left(self.ids, hi, self.pos)
+            out.extend(self.records[self.pos:end])
+            self.pos = end
+            return out
+
+    def close(self):
+        self.f.close()
+
+
+def _range_cuts(runs: list, max_rows: int, lo: str = None, hi: str = None) -> list:
+    """
+    Splits [lo, hi) into id ranges of roughly max_rows records, using block first
+    ids as the sample (each block holds at most RUN_BLOCK_ROWS records).
+    Returns the upper bounds of the ranges; the last one is hi.
+    """
+    samples = sorted(
+        first_id for run in runs for first_id in run[2]
+        if (lo is None or first_id > lo) and (hi is None or first_id < hi)
+    )
+    step = max(max_rows // RUN_BLOCK_ROWS, 1)
+    return sorted(set(samples[step::step])) + [hi]
+
+
+def _sorted_ranges(runs: list, max_rows: int, lo: str = None, hi: str = None):
+    """
+    Yields the records of the [lo, hi) id range of all runs as sorted lists of about
+    max_rows records. Each range concatenates the runs' slices in run order and is
+    sorted with a stable sort, so records of the same id keep the order of the
+    unsorted merge; timsort merges the presorted slices at C speed.
+    """
+    cursors = [_RunCursor(run, lo) for run in runs]
+    try:
+        for range_hi in _range_cuts(runs, max_rows, lo, hi):
+            records = []
+            for cursor in cursors:
+                records.extend(cursor.take_below(range_hi))
+            records.sort(key=itemgetter(0))
+            yield records
+    finally:
+        for cursor in cursors:
+            cursor.close()
+
+
+def _spill_file_runs(csv_f: Path, fieldnames: list, run_prefix: Path, file_idx: int, chunk_rows: int):
+    """
+    Worker: spills one interim CSV as id-sorted runs of about chunk_rows records.
+    Returns (run descriptors in merge order, rows read).
+    """
+    runs = []
+    rows_read = 0
+
+    def spill(buffer):
+        buffer.sort(key=itemgetter(0))  # stable: rows of the same id keep their file order
+        run_path = run_prefix.with_name(f"{run_prefix.name}_{len(runs):05d}.run")
+        runs.append(_write_run(run_path, (file_idx, len(runs)), buffer))
+
+    with _gc_paused():
+        buffer = []
+        for block in _encoded_blocks(csv_f, fieldnames, min(chunk_rows, READ_BLOCK_ROWS)):
+            if len(buffer) >= chunk_rows:
+                spill(buffer)
+                buffer = []
+            buffer.extend(block)
+            rows_read += len(block)
+        if buffer:
+            spill(buffer)
+
+    return runs, rows_read
+
+
+def _merge_partition(runs: list, lo: str, hi: str, out_path: Path, mode: str, chunk_rows: int) -> tuple:
+    """
+    Worker: merges the [lo, hi) id range of every run into out_path.
+    Returns (rows, unique ids).
+    """
+    rows_written = unique_ids = 0
+
+    with _gc_paused(), open(out_path, mode, encoding="utf-8", newline="") as f:
+        for records in _sorted_ranges(runs, chunk_rows, lo, hi):
+            unique_ids += _write_records(f, records)
+            rows_written += len(records)
+
+    return rows_written, unique_ids
+
+
+def _reduce_runs(runs: list, tmp_dir: Path, chunk_rows: int) -> list:
+    """Merges consecutive batches of runs until at most MAX_OPEN_RUNS remain."""
+    level = 0
+    while len(runs) > MAX_OPEN_RUNS:
+        merged = []
+        for start in range(0, len(runs), MAX_OPEN_RUNS):
+            batch = runs[start:start + MAX_OPEN_RUNS]
+            run_key = (level, len(merged))
+            out_path = tmp_dir / f"level{level}_{len(merged):05d}.run"
+            records = chain.from_iterable(_sorted_ranges(batch, chunk_rows))
+            merged.append(_write_run(out_path, run_key, records))
+            for run in batch:
+                run[0].unlink()
+        runs = merged
+        level += 1
+    return runs
+
+
+def merge_csv_files_sorted(interim_dir: Path, output_file: Path, workers: int = None, chunk_rows: int = 100_000):
+    """
+    Merges all country-specific CSVs into a master file sorted (clustered) by job id.
+    Within an id, rows keep the order of the unsorted merge (file name, then row),
+    so "keep first" deduplication gives the same result.
+
+    Rows are handled as (id, CSV line) records: intact source lines are reused,
+    other rows are re-encoded as soon as they are parsed. workers=1: records from all files share one buffer of
+    about chunk_rows records. If the data fits, it is sorted and written directly;
+    otherwise full buffers are spilled as sorted runs and merged back one id range
+    (about chunk_rows records) at a time.
+    workers>1 (default: CPU count): each file is spilled by a worker process, then
+    the id space is split into one partition per worker, merged in parallel and
+    concatenated.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be >= 1, got {chunk_rows}")
+    if workers < 1:
+        raise ValueError(f"workers must be >= 1, got {workers}")
+
+    csv_files = sorted([f for f in interim_dir.glob("*_jobs.csv") if f.name != output_file.name])
+
+    if not csv_files:
+        print("No country CSV files found to merge.")
+        return
+
+    fieldnames = _master_fieldnames(csv_files[0])
+
+    print(f"Merging {len(csv_files)} files into {output_file.name} (sorted by id, workers={workers}, chunk_rows={chunk_rows})...")
+
+    # Spill next to the output: the system temp dir may be a RAM-backed tmpfs
+    with tempfile.TemporaryDirectory(prefix="merge_runs_", dir=output_file.parent) as tmp, _gc_paused():
+        tmp_dir = Path(tmp)
+        runs = []
+        buffer = []
+        pool = None
+
+        if workers == 1:
+            for csv_f in csv_files:
                 rows_in_file = 0
-                for row in reader:
-                    # Inject country code
-                    row["country_code"] = country_code
-                    writer.writerow(row)
-                    rows_in_file += 1
-                
-                total_rows += rows_in_file
-                print(f"    Added {rows_in_file} rows.")
+                for block in _encoded_blocks(csv_f, fieldnames, min(chunk_rows, READ_BLOCK_ROWS)):
+                    # Spill a full buffer only once more records arrive
+                    if len(buffer) >= chunk_rows:
+                        buffer.sort(key=itemgetter(0))  # stable: merge order kept within an id
+                        runs.append(_write_run(tmp_dir / f"run{len(runs):05d}.run", (0, len(runs)), buffer))
+                        buffer = []
+                    buffer.extend(block)
+                    rows_in_file += len(block)
+                print(f"  Parsed {csv_f.name}: {rows_in_file} rows.")
+
+            if runs and buffer:
+                buffer.sort(key=itemgetter(0))
+                runs.append(_write_run(tmp_dir / f"run{len(runs):05d}.run", (0, len(runs)), buffer))
+                buffer = []
+            print(f"  Spilled {len(runs)} sorted run(s).")
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            results = pool.map(
+                _spill_file_runs,
+                csv_files,
+                repeat(fieldnames),
+                [tmp_dir / f"run{idx:05d}" for idx in range(len(csv_files))],
+                range(len(csv_files)),
+                repeat(chunk_rows),
+            )
+            for csv_f, (file_runs, rows_in_file) in zip(csv_files, results):
+                print(f"  Parsed {csv_f.name}: {rows_in_file} rows in {len(file_runs)} sorted run(s).")
+                runs.extend(file_runs)
 
+        try:
+            # Ties between runs are broken by run order, so keep runs in merge order
+            runs.sort(key=itemgetter(1))
+            runs = _reduce_runs(runs, tmp_dir, chunk_rows)
+
+            with open(output_file, "w", encoding="utf-8", newline="") as master_f:
+                csv.writer(master_f, quoting=csv.QUOTE_ALL).writerow(fieldnames)
+                if not runs:
+                    # Everything fit in memory: sort once and write
+                    buffer.sort(key=itemgetter(0))
+                    totals = [(len(buffer), _write_records(master_f, buffer))]
+
+            if runs and pool is None:
+                totals = [_merge_partition(runs, None, None, output_file, "a", chunk_rows)]
+            elif runs:
+                # One id partition per worker; the pieces are concatenated in order
+                cuts = _range_cuts(runs, max(sum(len(run[2]) for run in runs) * RUN_BLOCK_ROWS // workers, 1))
+                bounds = list(zip([None] + cuts[:-1], cuts))
+                part_paths = [tmp_dir / f"part{idx:05d}.csv" for idx in range(len(bounds))]
+                totals = list(pool.map(
+                    _merge_partition,
+                    repeat(runs),
+                    [lo for lo, _ in bounds],
+                    [hi for _, hi in bounds],
+                    part_paths,
+                    repeat("w"),
+                    repeat(chunk_rows),
+                ))
+                with open(output_file, "ab") as master_f:
+                    for part_path in part_paths:
+                        with open(part_path, "rb") as part_f:
+                            shutil.copyfileobj(part_f, master_f, 1024 * 1024)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    total_rows = sum(t[0] for t in totals)
+    unique_ids = sum(t[1] for t in totals)
     print(f"\n✅ Successfully merged {total_rows} total rows into {output_file.name}")
+    print(f"   {unique_ids} unique job ids, {total_rows - unique_ids} duplicate rows.")
+
+
+def iter_id_groups(merged_file: Path):
+    """Yields (id, rows) from a master CSV written by merge_csv_files_sorted, in one pass."""
+    with open(merged_file, "r", encoding="utf-8", newline="") as f:
+        for job_id, rows in groupby(csv.DictReader(f), key=itemgetter("id")):
+            yield job_id, list(rows)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge per-country interim CSVs into a master CSV")
+    parser.add_argument("--sort-by-id", action="store_true", help="Parallel external merge sort; output clustered by job id")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (and id-range partitions) for --sort-by-id. Default: CPU count")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Rows held in memory per worker before spilling a sorted run. Default: 100000")
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.chunk_rows < 1:
+        parser.error("--chunk-rows must be >= 1")
 
-def main():
     interim_dir = Path("data/interim")
     output_file = interim_dir / "all_jobs_merged.csv"
     
@@ -60,7 +521,10 @@ def main():
         print(f"ERROR: {interim_dir} does not exist.")
         return 1
         
-    merge_csv_files(interim_dir, output_file)
+    if args.sort_by_id:
+        merge_csv_files_sorted(interim_dir, output_file, workers=args.workers, chunk_rows=args.chunk_rows)
+    else:
+        merge_csv_files(interim_dir, output_file)
     return 0
 
 if __name__ == "__main__":